@@ -1,23 +1,132 @@
 import requests
 import random
-import json
 import os
+import re
+
+try:
+    import orjson as json  # 2-10x faster parse; drop-in for loads()
+except ImportError:
+    import json
+import asyncio
+import pickle
+import sqlite3
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from html import escape
 from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401 — several times faster than html.parser
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
 from geopy.geocoders import Nominatim
+from geopy.adapters import AioHTTPAdapter
+from geopy.extra.rate_limiter import AsyncRateLimiter
 import folium
+import jinja2
 from folium.plugins import MarkerCluster, HeatMap, Fullscreen
-import time
 import argparse
 import webbrowser
 from tqdm import tqdm
 
+# Fixed map overlay, compiled once at import; renders are plain interpolation
+_TITLE_TMPL = jinja2.Template(
+    '<div style="position:fixed; bottom:10px; left:10px; z-index:1000; background-color:white; '
+    'padding:10px; border-radius:5px; box-shadow:0 0 5px gray;">'
+    '<h3>{{ title }}</h3>'
+    '<p>This map shows important events that happened on this day in history.</p>'
+    '</div>'
+)
+
+
+class LocationCache:
+    """Dict-like location cache backed by SQLite: O(1) point lookups and
+    write-through inserts instead of rewriting a JSON file wholesale.
+    Misses are cached too (lat/lon NULL) and expire after NEGATIVE_TTL."""
+
+    NEGATIVE_TTL = 7 * 86400  # retry unresolved places after a week
+
+    def __init__(self, db_file):
+        self.conn = sqlite3.connect(db_file)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (place TEXT PRIMARY KEY, lat REAL, lon REAL, ts REAL)"
+        )
+        try:
+            self.conn.execute("ALTER TABLE cache ADD COLUMN ts REAL")
+        except sqlite3.OperationalError:
+            pass  # column already present
+        self.conn.commit()
+
+    def __contains__(self, place):
+        row = self.conn.execute(
+            "SELECT lat, ts FROM cache WHERE place=?", (place,)
+        ).fetchone()
+        if row is None:
+            return False
+        if row[0] is None and time.time() - (row[1] or 0) >= self.NEGATIVE_TTL:
+            return False  # stale negative entry — worth retrying
+        return True
+
+    def __getitem__(self, place):
+        row = self.conn.execute(
+            "SELECT lat, lon FROM cache WHERE place=?", (place,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(place)
+        if row[0] is None:
+            return None  # cached miss
+        return (row[0], row[1])
+
+    def __setitem__(self, place, coords):
+        lat, lon = coords if coords else (None, None)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache (place, lat, lon, ts) VALUES (?, ?, ?, ?)",
+            (place, lat, lon, time.time())
+        )
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
 class HistoricalEventsMapper:
+    # Capitalized noun phrases (up to 4 words, allowing 'of'/'de'/... connectors),
+    # compiled once — these are far better geocoding candidates than comma tokens
+    # The leading class covers non-ASCII capitals too (İstanbul, Łódź, Ōsaka);
+    # lowercase-led matches are rejected by the isupper() filter in extract_places
+    _PLACE_RE = re.compile(
+        r"\b[A-ZÀ-ɏ][A-Za-zÀ-ɏ]+(?:\s+(?:of|de|del|la|le)?\s*[A-ZÀ-ɏ][A-Za-zÀ-ɏ]+){0,3}\b"
+    )
+
+    # Leading words that mark a generic (non-place) phrase — usually sentence
+    # starts like 'The Battle' or 'After Years' the capitalization regex catches
+    _BAD_TOKENS = frozenset({
+        "the", "a", "an", "during", "after", "before", "following", "when",
+        "leader", "king", "queen", "president", "emperor", "general",
+        "first", "second", "third", "world",
+        "he", "she", "it", "they", "his", "her", "their", "this"
+    })
+
+    # Single-line popup template: formatted per event instead of rebuilding a
+    # triple-quoted literal (whose leading whitespace shipped into the HTML)
+    _POPUP_TMPL = (
+        '<div style="max-width:300px">'
+        '<h4>{title}</h4>'
+        '<p>{text}</p>'
+        '<h5>Related Links:</h5>'
+        '{links}'
+        '</div>'
+    )
+
     def __init__(self, config_file=None):
         # Get today's date or use provided date
         self.today = datetime.now()
         self.month = self.today.strftime("%B")
         self.day = self.today.day
+        self.dates = []  # optional extra (month, day) pairs fetched concurrently
         
         # Default configuration
         self.config = {
@@ -34,7 +143,7 @@ class HistoricalEventsMapper:
         if config_file and os.path.exists(config_file):
             try:
                 with open(config_file, 'r', encoding='utf-8') as f:
-                    self.config.update(json.load(f))
+                    self.config.update(json.loads(f.read()))
             except Exception as e:
                 print(f"[!] Error loading configuration file: {e}")
         
@@ -43,34 +152,101 @@ class HistoricalEventsMapper:
         if self.config["cache_locations"] and not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir, exist_ok=True)
         
-        # Location cache
-        self.location_cache = {}
-        self.load_location_cache()
-        
-        # Initialize geolocator
-        self.geolocator = Nominatim(user_agent="map_of_randomness")
+        # Location cache (SQLite-backed, write-through; in-memory when caching is off)
+        if self.config["cache_locations"]:
+            self.location_cache = LocationCache(os.path.join(self.cache_dir, "location_cache.db"))
+        else:
+            self.location_cache = LocationCache(":memory:")
+        self.migrate_json_cache()
 
-    def load_location_cache(self):
-        """Load location cache from file"""
+        # Offline gazetteer (GeoNames) for instant lookups of well-known places
+        self.gazetteer = self.load_gazetteer()
+
+        # Per-run memo so identical event texts resolve only once per create_map
+        self.geo_memo = {}
+
+        # Shared HTTP session so repeated requests reuse keep-alive connections
+        self.session = requests.Session()
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=16))
+
+        # Initialize geolocator (async adapter so pending requests overlap network latency)
+        self.geolocator = Nominatim(user_agent="map_of_randomness", adapter_factory=AioHTTPAdapter)
+
+    def migrate_json_cache(self):
+        """One-time import of the legacy location_cache.json into SQLite"""
         cache_file = os.path.join(self.cache_dir, "location_cache.json")
-        if os.path.exists(cache_file):
+        if os.path.exists(cache_file) and len(self.location_cache) == 0:
             try:
                 with open(cache_file, 'r', encoding='utf-8') as f:
-                    self.location_cache = json.load(f)
-                print(f"[✓] {len(self.location_cache)} location cache loaded")
+                    for place, coords in json.loads(f.read()).items():
+                        self.location_cache[place] = tuple(coords)
+                print(f"[✓] {len(self.location_cache)} locations migrated from JSON cache")
             except Exception as e:
-                print(f"[!] Error loading location cache: {e}")
+                print(f"[!] Error migrating location cache: {e}")
 
-    def save_location_cache(self):
-        """Save location cache to file"""
-        if self.config["cache_locations"]:
-            cache_file = os.path.join(self.cache_dir, "location_cache.json")
+    @staticmethod
+    def fold_ascii(name):
+        """Lowercase and strip accents so e.g. 'São Paulo' matches 'sao paulo'"""
+        folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+        return folded.lower()
+
+    def load_gazetteer(self):
+        """Load the offline GeoNames gazetteer, parsing the TSVs only on first run"""
+        gazetteer = {}
+        pickle_file = os.path.join(self.cache_dir, "gazetteer.pkl")
+        if os.path.exists(pickle_file):
             try:
-                with open(cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.location_cache, f, ensure_ascii=False, indent=2)
-                print(f"[✓] Location cache saved: {len(self.location_cache)} entries")
+                with open(pickle_file, 'rb') as f:
+                    gazetteer = pickle.load(f)
+                print(f"[✓] {len(gazetteer)} gazetteer entries loaded")
+                return gazetteer
             except Exception as e:
-                print(f"[!] Error saving location cache: {e}")
+                print(f"[!] Error loading gazetteer pickle: {e}")
+
+        # Build from GeoNames dumps (cities1000.txt / countryInfo.txt) if present
+        cities_file = os.path.join(self.cache_dir, "cities1000.txt")
+        if not os.path.exists(cities_file):
+            return gazetteer
+
+        try:
+            with open(cities_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    fields = line.rstrip("\n").split("\t")
+                    if len(fields) < 6:
+                        continue
+                    name, asciiname, alt_names = fields[1], fields[2], fields[3]
+                    coords = (float(fields[4]), float(fields[5]))
+                    gazetteer[name.lower()] = coords
+                    if asciiname:
+                        gazetteer[asciiname.lower()] = coords
+                    for alt in alt_names.split(","):
+                        if alt:
+                            gazetteer[self.fold_ascii(alt)] = coords
+
+            # Map country names to their capital's coordinates
+            country_file = os.path.join(self.cache_dir, "countryInfo.txt")
+            if os.path.exists(country_file):
+                with open(country_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.startswith("#"):
+                            continue
+                        fields = line.rstrip("\n").split("\t")
+                        if len(fields) < 6:
+                            continue
+                        country, capital = fields[4], fields[5]
+                        coords = gazetteer.get(capital.lower())
+                        if coords:
+                            gazetteer[country.lower()] = coords
+                            gazetteer[self.fold_ascii(country)] = coords
+
+            # Persist as pickle so later runs skip the TSV parse
+            with open(pickle_file, 'wb') as f:
+                pickle.dump(gazetteer, f, protocol=pickle.HIGHEST_PROTOCOL)
+            print(f"[✓] {len(gazetteer)} gazetteer entries loaded")
+        except Exception as e:
+            print(f"[!] Error loading gazetteer: {e}")
+
+        return gazetteer
 
     def set_date(self, month=None, day=None):
         """Set a specific date instead of today"""
@@ -80,143 +256,220 @@ class HistoricalEventsMapper:
             self.day = int(day)
         return self
 
-    def fetch_random_wikipedia_events(self):
-        """Fetch random historical events from Wikipedia"""
+    def set_dates(self, dates):
+        """Request several (month, day) pairs to be fetched in one run"""
+        self.dates = [(month, int(day)) for month, day in dates]
+        return self
+
+    def fetch_events_for_date(self, month, day):
+        """Fetch all anniversary events for one (month, day) from Wikipedia"""
         lang_prefix = self.config["language"]
         if lang_prefix == "en":
-            url = f"https://en.wikipedia.org/wiki/Wikipedia:Selected_anniversaries/{self.month}_{self.day}"
+            url = f"https://en.wikipedia.org/wiki/Wikipedia:Selected_anniversaries/{month}_{day}"
         else:
             # Different languages or URL structures can be used
-            url = f"https://{lang_prefix}.wikipedia.org/wiki/Wikipedia:Selected_anniversaries/{self.month}_{self.day}"
-            
+            url = f"https://{lang_prefix}.wikipedia.org/wiki/Wikipedia:Selected_anniversaries/{month}_{day}"
+
         print(f"[+] Fetching data from Wikipedia: {url}")
         
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()  # Error check
             
-            soup = BeautifulSoup(response.text, "html.parser")
+            # Pass raw bytes so the parser handles the encoding natively
+            soup = BeautifulSoup(response.content, _HTML_PARSER)
             events = []
             
-            for li in soup.select("ul > li"):
+            # Scope to the article body so nav/sidebar/footer <li>s are never walked
+            for li in soup.select("#mw-content-text .mw-parser-output > ul > li"):
                 text = li.get_text()
-                links = li.find_all("a", href=True)
-                
+
                 event_info = {"text": text, "links": []}
-                
-                for link in links:
-                    if link['href'].startswith("/wiki/") and ":" not in link['href']:
-                        title = link.get('title') or link.get_text()
-                        wiki_url = f"https://{lang_prefix}.wikipedia.org{link['href']}"
-                        event_info["links"].append({
-                            "title": title,
-                            "url": wiki_url
-                        })
+
+                # Prefix and namespace filters run in the C selector engine
+                for link in li.select("a[href^='/wiki/']:not([href*=':'])"):
+                    title = link.get('title') or link.get_text()
+                    wiki_url = f"https://{lang_prefix}.wikipedia.org{link['href']}"
+                    event_info["links"].append({
+                        "title": title,
+                        "url": wiki_url
+                    })
                 
                 if event_info["links"]:
                     event_info["title"] = event_info["links"][0]["title"]
                     event_info["url"] = event_info["links"][0]["url"]
                     events.append(event_info)
-            
-            # Select random events up to the maximum limit
-            if events:
-                return random.sample(events, min(self.config["max_events"], len(events)))
-            else:
-                print("[!] No events found")
-                return []
-                
+
+            return events
+
         except Exception as e:
             print(f"[!] Error fetching Wikipedia data: {e}")
             return []
 
+    def fetch_random_wikipedia_events(self):
+        """Fetch random historical events from Wikipedia"""
+        dates = self.dates or [(self.month, self.day)]
+
+        if len(dates) == 1:
+            events = self.fetch_events_for_date(*dates[0])
+        else:
+            # Independent pages: overlap their network latency in a thread pool
+            # (the shared Session handles concurrent GETs up to pool_maxsize)
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = executor.map(lambda d: self.fetch_events_for_date(*d), dates)
+            events = [event for batch in results for event in batch]
+
+        # Select random events up to the maximum limit
+        if events:
+            return random.sample(events, min(self.config["max_events"], len(events)))
+        else:
+            print("[!] No events found")
+            return []
+
+    def extract_places(self, event_text):
+        """Extract candidate place names from the event text, likeliest first"""
+        # dict.fromkeys deduplicates while preserving order
+        candidates = dict.fromkeys(self._PLACE_RE.findall(event_text))
+        # Rank so the first (rate-limited) geocode attempt is the likeliest hit:
+        # more capitalized words first, longer phrases breaking ties. Skip
+        # anything lowercase-led or containing digits — Nominatim won't resolve it
+        return sorted(
+            (p for p in candidates
+             if p[:1].isupper() and not any(c.isdigit() for c in p)
+             and p.split()[0].lower() not in self._BAD_TOKENS),
+            key=lambda p: (-sum(1 for w in p.split() if w[:1].isupper()), -len(p))
+        )
+
+    async def geocode_places(self, places):
+        """Geocode uncached places concurrently, respecting Nominatim's 1 req/s policy"""
+        async with self.geolocator:
+            geocode = AsyncRateLimiter(self.geolocator.geocode, min_delay_seconds=1)
+            results = await asyncio.gather(
+                *(geocode(place, timeout=10) for place in places),
+                return_exceptions=True
+            )
+
+        for place, location in zip(places, results):
+            if isinstance(location, Exception):
+                print(f"[!] Error: {location}")
+            elif location:
+                coords = (location.latitude, location.longitude)
+                print(f"[✓] Location found: {place} → {coords}")
+                # Add to cache
+                self.location_cache[place] = coords
+            else:
+                # Cache the miss so future runs don't burn a rate-limit slot on it
+                self.location_cache[place] = None
+
+    def warm_location_cache(self, events):
+        """Resolve every uncached candidate place across all events in one async batch"""
+        # Deduplicate candidates while preserving order
+        candidates = dict.fromkeys(
+            place
+            for event in events
+            for place in self.extract_places(event["text"])
+        )
+        uncached = [p for p in candidates
+                    if p.lower() not in self.gazetteer and p not in self.location_cache]
+        if uncached:
+            asyncio.run(self.geocode_places(uncached))
+
     def geolocate_event(self, event_text):
         """Geolocate the event using location keywords"""
-        places_to_try = [p.strip() for p in event_text.split(",") if len(p.strip()) > 3]
-        
-        for place in places_to_try:
-            # Check the cache
+        if event_text in self.geo_memo:
+            return self.geo_memo[event_text]
+
+        coords = self.resolve_places(event_text)
+        self.geo_memo[event_text] = coords
+        return coords
+
+    def resolve_places(self, event_text):
+        """Resolve the first candidate place with known coordinates"""
+        for place in self.extract_places(event_text):
+            # Check the offline gazetteer first (microsecond dict lookup, no network)
+            coords = self.gazetteer.get(place.lower())
+            if coords:
+                print(f"[✓] Location found in gazetteer: {place} → {coords}")
+                return coords
+
+            # Check the cache (warmed up front for the whole batch)
             if place in self.location_cache:
                 coords = self.location_cache[place]
+                if coords is None:
+                    continue  # known miss — try the next candidate
                 print(f"[✓] Location found in cache: {place} → {coords}")
                 return coords
-            
-            try:
-                location = self.geolocator.geocode(place, timeout=10)
-                if location:
-                    coords = (location.latitude, location.longitude)
-                    print(f"[✓] Location found: {place} → {coords}")
-                    # Add to cache
-                    self.location_cache[place] = coords
-                    return coords
-            except Exception as e:
-                print(f"[!] Error: {e}")
-            
-            time.sleep(1)  # Sleep for API rate limiting
-        
+
         return None
 
     def create_map(self, events):
         """Create the interactive map with events"""
-        # Map center and zoom level
-        map_obj = folium.Map(location=[20, 0], zoom_start=2)
+        # Map center and zoom level; canvas rendering scales much better than
+        # the default SVG layer once the map holds hundreds of markers
+        map_obj = folium.Map(
+            location=[20, 0],
+            zoom_start=2,
+            prefer_canvas=True,
+            zoom_animation=True,
+            fade_animation=False
+        )
         
         # Add fullscreen control
         Fullscreen().add_to(map_obj)
         
         # Use marker cluster
         if self.config["use_marker_cluster"]:
-            marker_cluster = MarkerCluster().add_to(map_obj)
-        
-        # Heatmap data
-        heat_data = []
-        
+            marker_cluster = MarkerCluster(
+                name="Historical Events",
+                options={
+                    # Cluster in time slices so the browser UI stays responsive
+                    "chunkedLoading": True,
+                    "chunkInterval": 200,
+                    "chunkDelay": 50,
+                    "removeOutsideVisibleBounds": True
+                }
+            ).add_to(map_obj)
+
+        # Resolved coordinates, kept for the optional heatmap
+        locations = []
+
         print("[*] Finding locations for events...")
+        self.geo_memo.clear()
+        self.warm_location_cache(events)
         for event in tqdm(events):
             coords = self.geolocate_event(event["text"])
             if coords:
                 # Create rich content with links
-                links_html = "<br>".join([f"<a href='{link['url']}' target='_blank'>{link['title']}</a>" 
-                                         for link in event.get("links", [])])
-                
-                popup_content = f"""
-                <div style="max-width:300px">
-                    <h4>{event.get('title', 'Historical Event')}</h4>
-                    <p>{event['text']}</p>
-                    <h5>Related Links:</h5>
-                    {links_html}
-                </div>
-                """
-                
+                # Cap the link list and escape everything Wikipedia-sourced —
+                # unbounded raw titles bloat the output and can break the HTML
+                links_html = "<br>".join(
+                    f"<a href='{escape(link['url'], quote=True)}' target='_blank'>{escape(link['title'])}</a>"
+                    for link in event.get("links", [])[:5]
+                )
+
+                popup_content = self._POPUP_TMPL.format(
+                    title=escape(event.get('title', 'Historical Event')),
+                    text=escape(event['text']),
+                    links=links_html
+                )
+
                 # Add marker
-                if self.config["use_marker_cluster"]:
-                    folium.Marker(
-                        location=coords,
-                        tooltip=event.get('title', 'Click'),
-                        popup=folium.Popup(popup_content, max_width=300)
-                    ).add_to(marker_cluster)
-                else:
-                    folium.Marker(
-                        location=coords,
-                        tooltip=event.get('title', 'Click'),
-                        popup=folium.Popup(popup_content, max_width=300)
-                    ).add_to(map_obj)
-                
-                # Add heatmap data
-                heat_data.append([coords[0], coords[1], 1.0])
-        
-        # Create heatmap (optional)
-        if self.config["use_heatmap"] and heat_data:
-            HeatMap(heat_data).add_to(map_obj)
+                folium.Marker(
+                    location=coords,
+                    tooltip=escape(event.get('title', 'Click')),
+                    popup=folium.Popup(popup_content, max_width=300)
+                ).add_to(marker_cluster if self.config["use_marker_cluster"] else map_obj)
+
+                locations.append(coords)
+
+        # Create heatmap (optional) — built from the resolved locations only
+        # when enabled, instead of appending a row per event unconditionally
+        if self.config["use_heatmap"] and locations:
+            HeatMap([[lat, lon, 1.0] for lat, lon in locations]).add_to(map_obj)
         
         # Add map title
         map_title = f"Historical Events of {self.month} {self.day}"
-        map_obj.get_root().html.add_child(folium.Element(f"""
-        <div style="position:fixed; bottom:10px; left:10px; z-index:1000; background-color:white; 
-                    padding:10px; border-radius:5px; box-shadow:0 0 5px gray;">
-            <h3>{map_title}</h3>
-            <p>This map shows important events that happened on this day in history.</p>
-        </div>
-        """))
+        map_obj.get_root().html.add_child(folium.Element(_TITLE_TMPL.render(title=map_title)))
         
         return map_obj
 
@@ -233,14 +486,12 @@ class HistoricalEventsMapper:
         map_obj = self.create_map(events)
         
         # Create output folder
-        os.makedirs(os.path.dirname(self.config["output_path"]), exist_ok=True)
-        
+        output_path = self.config["output_path"]
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
         # Save the map
-        map_obj.save(self.config["output_path"])
-        print(f"[✓] Map created successfully! File saved at: {self.config['output_path']}")
-        
-        # Save location cache
-        self.save_location_cache()
+        map_obj.save(output_path)
+        print(f"[✓] Map created successfully! File saved at: {output_path}")
         
         # Open automatically?
         if self.config["auto_open"]:
@@ -254,6 +505,7 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description="Historical Events Map Generator")
     parser.add_argument("--month", help="Month name (English, e.g., January)")
     parser.add_argument("--day", help="Day (1-31)")
+    parser.add_argument("--dates", help="Several dates fetched concurrently, e.g. 'January 1,July 4'")
     parser.add_argument("--config", help="Path to configuration file")
     parser.add_argument("--output", help="Path to output HTML file")
     parser.add_argument("--max-events", type=int, help="Maximum number of events")
@@ -285,8 +537,10 @@ if __name__ == "__main__":
     if args.no_open:
         mapper.config["auto_open"] = False
     
-    # Set specific date (if any)
-    if args.month or args.day:
+    # Set specific date(s) (if any)
+    if args.dates:
+        mapper.set_dates(spec.strip().split() for spec in args.dates.split(","))
+    elif args.month or args.day:
         mapper.set_date(args.month, args.day)
     
     # Run